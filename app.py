@@ -3,9 +3,11 @@ GWI Nonprofit Partner Explorer  —  Streamlit app
 Run:  streamlit run app.py
 """
 
+import itertools
 import os
 import re
 
+import altair as alt
 import folium
 import pandas as pd
 import requests
@@ -13,6 +15,8 @@ import streamlit as st
 
 from streamlit_folium import st_folium
 
+import warmup
+
 # ── page config ───────────────────────────────────────────────────────────────
 st.set_page_config(
     page_title="GWI Nonprofit Partner Explorer",
@@ -195,7 +199,6 @@ st.markdown(
 
 
 # ── Lawrence, MA boundary ─────────────────────────────────────────────────────
-@st.cache_data(ttl=86400)
 def fetch_lawrence_boundary() -> dict | None:
     """Fetch Lawrence, MA city boundary GeoJSON from Nominatim."""
     try:
@@ -222,7 +225,6 @@ def fetch_lawrence_boundary() -> dict | None:
 CSV_PATH = "GWIorgs_v3.csv"
 
 
-@st.cache_data(ttl=3600)
 def load_data(path: str) -> pd.DataFrame:
     if not os.path.exists(path):
         return pd.DataFrame()
@@ -244,7 +246,216 @@ def load_data(path: str) -> pd.DataFrame:
     return df
 
 
-df = load_data(CSV_PATH)
+def dataset_version(path: str) -> float:
+    """Modification time of the data file — changes whenever the CSV is replaced."""
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+# ── aggregation cube ──────────────────────────────────────────────────────────
+CUBE_DIMS = ["Category", "Population", "Status", "OrgType", "City"]
+CUBE_LABELS = {
+    "Category": "Category",
+    "Population": "Population Served",
+    "Status": "Status",
+    "OrgType": "Org Type",
+    "City": "City",
+}
+# Marks a dimension that has been rolled up (every value of it combined)
+CUBE_ALL = "(All)"
+
+
+def build_count_cube(df: pd.DataFrame) -> pd.Series:
+    """Distinct-org counts for every Category × Population × Status × OrgType × City
+    cell, plus every roll-up of those dimensions (like SQL ``GROUP BY CUBE``).
+
+    Built once per dataset version by the warm-up. Because each roll-up is
+    counted separately, orgs listed under several categories, populations or
+    org types are still counted once per cell.
+    """
+    if df.empty:  # missing data file
+        return pd.Series(
+            [],
+            index=pd.MultiIndex.from_arrays([[]] * len(CUBE_DIMS), names=CUBE_DIMS),
+            dtype=int,
+            name="Orgs",
+        )
+    facts = df[["CatList", "PopList", "Status", "OrgType", "City"]].rename(
+        columns={"CatList": "Category", "PopList": "Population"}
+    )
+    facts["Population"] = facts["Population"].apply(lambda lst: lst or ["Not specified"])
+    facts["OrgType"] = facts["OrgType"].apply(
+        lambda s: _smart_split(s) or ["Not specified"]
+    )
+    facts["City"] = facts["City"].str.strip().replace("", "Unknown")
+    facts = facts.rename_axis("org").reset_index()
+    facts = facts.explode("Category").explode("Population").explode("OrgType")
+
+    parts = []
+    for r in range(len(CUBE_DIMS) + 1):
+        for kept in itertools.combinations(CUBE_DIMS, r):
+            if kept:
+                part = facts.groupby(list(kept))["org"].nunique().reset_index(name="Orgs")
+            else:
+                part = pd.DataFrame({"Orgs": [facts["org"].nunique()]})
+            for dim in CUBE_DIMS:
+                if dim not in kept:
+                    part[dim] = CUBE_ALL
+            parts.append(part)
+    return pd.concat(parts, ignore_index=True).set_index(CUBE_DIMS)["Orgs"].sort_index()
+
+
+def cube_values(cube: pd.Series, dim: str) -> list[str]:
+    """All values a dimension takes in the cube (roll-up marker excluded)."""
+    return sorted(v for v in cube.index.unique(level=dim) if v != CUBE_ALL)
+
+
+def query_cube(
+    cube: pd.Series, rows: str, cols: str, where: dict[str, str] | None = None
+) -> pd.DataFrame:
+    """Rows × cols table of org counts, with the other dimensions sliced to the
+    values in ``where`` or rolled up. Read straight from the cube; empty cells are 0.
+    """
+    where = where or {}
+    fixed = {d: where.get(d, CUBE_ALL) for d in CUBE_DIMS if d not in (rows, cols)}
+    try:
+        sub = cube.xs(tuple(fixed.values()), level=list(fixed))
+    except KeyError:
+        sub = cube.iloc[:0].droplevel(list(fixed))
+    sub = sub[
+        (sub.index.get_level_values(rows) != CUBE_ALL)
+        & (sub.index.get_level_values(cols) != CUBE_ALL)
+    ]
+    table = sub.unstack(cols, fill_value=0) if not sub.empty else pd.DataFrame()
+    return table.reindex(
+        index=cube_values(cube, rows), columns=cube_values(cube, cols), fill_value=0
+    ).astype(int)
+
+
+# ── map markers ───────────────────────────────────────────────────────────────
+def _marker_html(row: pd.Series) -> tuple[str, str, str]:
+    """Popup, tooltip and pin icon HTML for one organization's map marker."""
+    status = row["Status"]
+    color_hex = STATUS_HEX.get(status, "#6b7280")
+    cats = row["CatList"]
+    pin_color = CAT_COLORS.get(cats[0] if cats else "Unknown", "#94a3b8")
+    svc_tags = row["ServiceArea"] or "Not specified"
+    pop = row["Population"] or "Not specified"
+    org_type = row["OrgType"] or "Not specified"
+    url = row["URL"]
+
+    url_html = (
+        f'<a href="{url}" target="_blank" '
+        f'style="display:inline-block;margin-top:10px;padding:6px 14px;'
+        f"background:{BRAND_DARK};color:white;border-radius:6px;"
+        f'font-size:12px;font-weight:600;text-decoration:none;">🔗 Visit Website</a>'
+        if url
+        else f'<span style="color:#94a3b8;font-size:12px;">No website listed</span>'
+    )
+
+    cat_badges = " ".join(
+        f'<span style="background:{CAT_COLORS.get(c, "#94a3b8")};color:white;'
+        f'border-radius:12px;padding:2px 9px;font-size:10px;font-weight:700;">{c}</span>'
+        for c in cats
+    )
+
+    popup_html = (
+        # Colored header bar
+        f'<div style="font-family:Inter,sans-serif;width:310px;'
+        f'border-radius:10px;overflow:hidden;box-shadow:0 2px 12px rgba(0,0,0,.12);">'
+        f'<div style="background:{pin_color};padding:14px 16px;">'
+        f'<div style="font-size:15px;font-weight:700;color:white;'
+        f'line-height:1.3;">{row["Name"]}</div>'
+        f'<div style="margin-top:6px;">'
+        f'<span style="background:rgba(0,0,0,.25);color:white;border-radius:20px;'
+        f'padding:2px 10px;font-size:11px;font-weight:600;">{status}</span>'
+        f"</div></div>"
+        # Body
+        f'<div style="padding:12px 16px;background:white;">'
+        f'<div style="margin-bottom:8px;">{cat_badges}</div>'
+        f'<table style="width:100%;border-collapse:collapse;font-size:12px;'
+        f'color:{TEXT_DARK};">'
+        f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
+        f'font-weight:700;text-transform:uppercase;white-space:nowrap;">Address</td>'
+        f"<td>{row['Address']}, {row['City']}, {row['State']}</td></tr>"
+        f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
+        f'font-weight:700;text-transform:uppercase;white-space:nowrap;">Type</td>'
+        f"<td>{org_type}</td></tr>"
+        f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
+        f'font-weight:700;text-transform:uppercase;white-space:nowrap;">Population</td>'
+        f"<td>{pop}</td></tr>"
+        f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
+        f"font-weight:700;text-transform:uppercase;white-space:nowrap;"
+        f'vertical-align:top;">Services</td>'
+        f'<td style="color:{TEXT_MID};">{svc_tags}</td></tr>'
+        f"</table>"
+        f"{url_html}"
+        f"</div></div>"
+    )
+
+    tooltip_html = (
+        f'<div style="font-family:Inter,sans-serif;font-size:13px;'
+        f'font-weight:700;color:{BRAND_DARK};max-width:200px;">{row["Name"]}</div>'
+        f'<div style="font-size:11px;color:{TEXT_MID};">{cats[0] if cats else ""}</div>'
+    )
+
+    pin_svg = (
+        f'<div style="width:25px;height:41px;">'
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 32 52" width="25" height="41">'
+        f'<path d="M16 0C7.163 0 0 7.163 0 16c0 10 16 36 16 36S32 26 32 16C32 7.163 24.837 0 16 0z"'
+        f' fill="{pin_color}" stroke="#fff" stroke-width="2"/>'
+        f'<circle cx="16" cy="16" r="7" fill="white" opacity="0.85"/>'
+        f'</svg></div>'
+    )
+    return popup_html, tooltip_html, pin_svg
+
+
+def build_marker_html(df: pd.DataFrame) -> dict[int, tuple[str, str, str]]:
+    """Marker HTML for every plottable org, keyed by row index."""
+    if df.empty:  # missing data file
+        return {}
+    plottable = df.dropna(subset=["Latitude", "Longitude"])
+    return {idx: _marker_html(row) for idx, row in plottable.iterrows()}
+
+
+# ── background warm-up ────────────────────────────────────────────────────────
+WARMUP_STAGES = {
+    "data": "Organizations",
+    "boundary": "City boundary",
+    "markers": "Map markers",
+    "cube": "Coverage cube",
+}
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup(path: str) -> warmup.Warmup:
+    return warmup.start(
+        path,
+        version=dataset_version,
+        load=load_data,
+        derived={"markers": build_marker_html, "cube": build_count_cube},
+        boundary=fetch_lawrence_boundary,
+    )
+
+
+warm = start_warmup(CSV_PATH)
+warm.refresh_stale()
+# One snapshot per script run, so a refresh landing mid-run can't mix versions
+_stages = warm.futures
+
+
+def await_stage(stage: str, label: str):
+    """Result of a warm-up stage, showing a placeholder while it is still running."""
+    fut = _stages[stage]
+    if fut.done():
+        return fut.result()
+    slot = st.empty()
+    slot.info(f"⏳ {label}…")
+    result = fut.result()
+    slot.empty()
+    return result
+
+
+df = await_stage("data", "Loading organizations")
 
 if df.empty:
     st.error(
@@ -373,137 +584,31 @@ with hdr_l:
         unsafe_allow_html=True,
     )
 with hdr_r:
-    pass
+    # Polls only while this run saw stages pending, so a settled page stays idle
+    @st.fragment(run_every=3 if not all(warm.ready().values()) else None)
+    def readiness_notice() -> None:
+        """Which warm-up stages are still running; renders nothing once all are done."""
+        pending = [WARMUP_STAGES[k] for k, done in warm.ready().items() if not done]
+        if pending:
+            st.markdown(
+                f"<p style='color:{TEXT_MID};font-size:14px;margin:0;text-align:right;'>"
+                f"⏳ Still warming up: {', '.join(pending)}</p>",
+                unsafe_allow_html=True,
+            )
+
+    readiness_notice()
 
 st.divider()
 
 # ── tabs ──────────────────────────────────────────────────────────────────────
-tab_map, tab_dir, tab_detail = st.tabs(
-    ["🗺️  Map", "📋  Directory", "🔎  Organization Detail"]
+tab_map, tab_dir, tab_detail, tab_analytics = st.tabs(
+    ["🗺️  Map", "📋  Directory", "🔎  Organization Detail", "📊  Coverage Analytics"]
 )
 
 
-# ══════════════════════════════════════════════════════════
-# TAB 1 — MAP
-# ══════════════════════════════════════════════════════════
-with tab_map:
-    map_data = filtered.dropna(subset=["Latitude", "Longitude"])
-
-    if filtered.empty:
-        st.warning(_NO_RESULTS)
-    elif map_data.empty:
-        st.info("Matching organizations have no coordinates to plot.")
-    else:
-        m = folium.Map(
-            location=[42.7070, -71.1631],
-            zoom_start=13,
-            tiles="CartoDB Voyager",
-        )
-
-        # City boundary
-        lawrence_geojson = fetch_lawrence_boundary()
-        if lawrence_geojson:
-            folium.GeoJson(
-                lawrence_geojson,
-                style_function=lambda _: {
-                    "color": BRAND_DARK,
-                    "weight": 3,
-                    "fillColor": BRAND_DARK,
-                    "fillOpacity": 0.05,
-                    "dashArray": "8 5",
-                },
-            ).add_to(m)
-
-        for _, row in map_data.iterrows():
-            status = row["Status"]
-            color_hex = STATUS_HEX.get(status, "#6b7280")
-            cats = row["CatList"]
-            pin_color = CAT_COLORS.get(cats[0] if cats else "Unknown", "#94a3b8")
-            svc_tags = row["ServiceArea"] or "Not specified"
-            pop = row["Population"] or "Not specified"
-            org_type = row["OrgType"] or "Not specified"
-            url = row["URL"]
-
-            url_html = (
-                f'<a href="{url}" target="_blank" '
-                f'style="display:inline-block;margin-top:10px;padding:6px 14px;'
-                f"background:{BRAND_DARK};color:white;border-radius:6px;"
-                f'font-size:12px;font-weight:600;text-decoration:none;">🔗 Visit Website</a>'
-                if url
-                else f'<span style="color:#94a3b8;font-size:12px;">No website listed</span>'
-            )
-
-            cat_badges = " ".join(
-                f'<span style="background:{CAT_COLORS.get(c, "#94a3b8")};color:white;'
-                f'border-radius:12px;padding:2px 9px;font-size:10px;font-weight:700;">{c}</span>'
-                for c in cats
-            )
-
-            popup_html = (
-                # Colored header bar
-                f'<div style="font-family:Inter,sans-serif;width:310px;'
-                f'border-radius:10px;overflow:hidden;box-shadow:0 2px 12px rgba(0,0,0,.12);">'
-                f'<div style="background:{pin_color};padding:14px 16px;">'
-                f'<div style="font-size:15px;font-weight:700;color:white;'
-                f'line-height:1.3;">{row["Name"]}</div>'
-                f'<div style="margin-top:6px;">'
-                f'<span style="background:rgba(0,0,0,.25);color:white;border-radius:20px;'
-                f'padding:2px 10px;font-size:11px;font-weight:600;">{status}</span>'
-                f"</div></div>"
-                # Body
-                f'<div style="padding:12px 16px;background:white;">'
-                f'<div style="margin-bottom:8px;">{cat_badges}</div>'
-                f'<table style="width:100%;border-collapse:collapse;font-size:12px;'
-                f'color:{TEXT_DARK};">'
-                f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
-                f'font-weight:700;text-transform:uppercase;white-space:nowrap;">Address</td>'
-                f"<td>{row['Address']}, {row['City']}, {row['State']}</td></tr>"
-                f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
-                f'font-weight:700;text-transform:uppercase;white-space:nowrap;">Type</td>'
-                f"<td>{org_type}</td></tr>"
-                f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
-                f'font-weight:700;text-transform:uppercase;white-space:nowrap;">Population</td>'
-                f"<td>{pop}</td></tr>"
-                f'<tr><td style="color:#94a3b8;padding:3px 10px 3px 0;font-size:10px;'
-                f"font-weight:700;text-transform:uppercase;white-space:nowrap;"
-                f'vertical-align:top;">Services</td>'
-                f'<td style="color:{TEXT_MID};">{svc_tags}</td></tr>'
-                f"</table>"
-                f"{url_html}"
-                f"</div></div>"
-            )
-
-            tooltip_html = (
-                f'<div style="font-family:Inter,sans-serif;font-size:13px;'
-                f'font-weight:700;color:{BRAND_DARK};max-width:200px;">{row["Name"]}</div>'
-                f'<div style="font-size:11px;color:{TEXT_MID};">{cats[0] if cats else ""}</div>'
-            )
-
-            pin_svg = (
-                f'<div style="width:25px;height:41px;">'
-                f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 32 52" width="25" height="41">'
-                f'<path d="M16 0C7.163 0 0 7.163 0 16c0 10 16 36 16 36S32 26 32 16C32 7.163 24.837 0 16 0z"'
-                f' fill="{pin_color}" stroke="#fff" stroke-width="2"/>'
-                f'<circle cx="16" cy="16" r="7" fill="white" opacity="0.85"/>'
-                f'</svg></div>'
-            )
-            folium.Marker(
-                location=[row["Latitude"], row["Longitude"]],
-                popup=folium.Popup(popup_html, max_width=340),
-                tooltip=folium.Tooltip(tooltip_html),
-                icon=folium.DivIcon(
-                    html=pin_svg,
-                    icon_size=(25, 41),
-                    icon_anchor=(12, 41),
-                    popup_anchor=(0, -38),
-                ),
-            ).add_to(m)
-
-        st_folium(m, use_container_width=True, height=620, returned_objects=[])
-        st.caption(
-            f"{len(map_data)} organizations plotted · Markers colored by category · Click for details"
-        )
-
+# Tab blocks run in order of what they wait on, not in on-screen order, so each
+# renders as soon as it can: directory and detail need only the org data, then
+# analytics (the cube), and the map last (Nominatim boundary and markers).
 
 # ══════════════════════════════════════════════════════════
 # TAB 2 — DIRECTORY
@@ -674,3 +779,144 @@ with tab_detail:
                 )
             else:
                 st.info("No map coordinates available for this organization.")
+
+
+# ══════════════════════════════════════════════════════════
+# TAB 4 — COVERAGE ANALYTICS
+# ══════════════════════════════════════════════════════════
+with tab_analytics:
+    cube = await_stage("cube", "Building the coverage cube")
+
+    ctl_rows, ctl_cols, ctl_gap = st.columns(3)
+    with ctl_rows:
+        rows_dim = st.selectbox(
+            "Rows", CUBE_DIMS, format_func=CUBE_LABELS.get, key="cube_rows"
+        )
+    with ctl_cols:
+        cols_dim = st.selectbox(
+            "Columns",
+            [d for d in CUBE_DIMS if d != rows_dim],
+            format_func=CUBE_LABELS.get,
+            key="cube_cols",
+        )
+    with ctl_gap:
+        gap_max = st.number_input(
+            "Flag cells with at most … orgs", min_value=0, value=0, step=1, key="cube_gap"
+        )
+
+    slice_dims = [d for d in CUBE_DIMS if d not in (rows_dim, cols_dim)]
+    where: dict[str, str] = {}
+    for dim, col in zip(slice_dims, st.columns(len(slice_dims))):
+        with col:
+            val = st.selectbox(
+                CUBE_LABELS[dim],
+                [CUBE_ALL] + cube_values(cube, dim),
+                key=f"cube_slice_{dim}",
+            )
+        if val != CUBE_ALL:
+            where[dim] = val
+
+    table = query_cube(cube, rows_dim, cols_dim, where)
+    cells = (
+        table.rename_axis(index=rows_dim, columns=cols_dim)
+        .stack()
+        .rename("Orgs")
+        .reset_index()
+    )
+
+    base = alt.Chart(cells).encode(
+        x=alt.X(f"{cols_dim}:N", title=CUBE_LABELS[cols_dim], axis=alt.Axis(labelAngle=-40)),
+        y=alt.Y(f"{rows_dim}:N", title=CUBE_LABELS[rows_dim]),
+    )
+    heat = base.mark_rect(stroke=BG_WHITE).encode(
+        color=alt.Color("Orgs:Q", scale=alt.Scale(scheme="blues"), title="Orgs"),
+        tooltip=[
+            alt.Tooltip(f"{rows_dim}:N", title=CUBE_LABELS[rows_dim]),
+            alt.Tooltip(f"{cols_dim}:N", title=CUBE_LABELS[cols_dim]),
+            alt.Tooltip("Orgs:Q"),
+        ],
+    )
+    labels = base.mark_text(fontSize=11).encode(
+        text="Orgs:Q",
+        color=alt.condition(
+            alt.datum.Orgs > int(table.values.max(initial=0)) / 2,
+            alt.value(BG_WHITE),
+            alt.value(TEXT_DARK),
+        ),
+    )
+    st.altair_chart(
+        (heat + labels).properties(height=max(260, 34 * len(table.index))),
+        use_container_width=True,
+    )
+    st.caption(
+        "Counts cover all organizations (sidebar filters don't apply) · "
+        "Orgs with several categories, populations or types count once in each"
+    )
+
+    gaps = cells[cells["Orgs"] <= gap_max].sort_values(["Orgs", rows_dim, cols_dim])
+    st.markdown(
+        f"<p style='font-size:16px;font-weight:700;color:{BRAND_DARK};margin:16px 0 6px;'>"
+        f"Coverage gaps — {len(gaps)} of {len(cells)} combinations</p>",
+        unsafe_allow_html=True,
+    )
+    if gaps.empty:
+        st.info("No combinations at or below the threshold.")
+    else:
+        st.dataframe(
+            gaps.rename(columns=CUBE_LABELS),
+            use_container_width=True,
+            height=320,
+            hide_index=True,
+        )
+
+
+# ══════════════════════════════════════════════════════════
+# TAB 1 — MAP
+# ══════════════════════════════════════════════════════════
+with tab_map:
+    map_data = filtered.dropna(subset=["Latitude", "Longitude"])
+
+    if filtered.empty:
+        st.warning(_NO_RESULTS)
+    elif map_data.empty:
+        st.info("Matching organizations have no coordinates to plot.")
+    else:
+        m = folium.Map(
+            location=[42.7070, -71.1631],
+            zoom_start=13,
+            tiles="CartoDB Voyager",
+        )
+
+        # City boundary
+        lawrence_geojson = await_stage("boundary", "Fetching the Lawrence city boundary")
+        if lawrence_geojson:
+            folium.GeoJson(
+                lawrence_geojson,
+                style_function=lambda _: {
+                    "color": BRAND_DARK,
+                    "weight": 3,
+                    "fillColor": BRAND_DARK,
+                    "fillOpacity": 0.05,
+                    "dashArray": "8 5",
+                },
+            ).add_to(m)
+
+        markers = await_stage("markers", "Preparing map markers")
+        for idx, row in map_data.iterrows():
+            popup_html, tooltip_html, pin_svg = markers[idx]
+            folium.Marker(
+                location=[row["Latitude"], row["Longitude"]],
+                popup=folium.Popup(popup_html, max_width=340),
+                tooltip=folium.Tooltip(tooltip_html),
+                icon=folium.DivIcon(
+                    html=pin_svg,
+                    icon_size=(25, 41),
+                    icon_anchor=(12, 41),
+                    popup_anchor=(0, -38),
+                ),
+            ).add_to(m)
+
+        st_folium(m, use_container_width=True, height=620, returned_objects=[])
+        st.caption(
+            f"{len(map_data)} organizations plotted · Markers colored by category · Click for details"
+        )
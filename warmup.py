@@ -0,0 +1,164 @@
+"""
+Background warm-up of the explorer's slow caches — CSV parsing, the city
+boundary fetch, and everything derived from the data (marker HTML, the
+coverage cube).
+
+Lives outside app.py because Streamlit re-executes app.py on every rerun while
+imported modules persist: the Warmup class stays the same object, and the live
+instance can be tracked here and closed when a new one replaces it.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+import pandas as pd
+
+DATA_TTL = 3600  # backstop re-check of the CSV version (seconds); runs also check
+BOUNDARY_TTL = 86400
+REFRESH_AHEAD = 0.8  # refresh once this fraction of a TTL has elapsed
+
+
+def _resolved(value) -> Future:
+    fut = Future()
+    fut.set_result(value)
+    return fut
+
+
+class Warmup:
+    """Process-wide warm caches. A worker pool fills every stage when the process
+    starts, and a refresh thread replaces each stage before its TTL runs out, so
+    no visitor ever waits on an expired entry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        version: Callable[[str], float],
+        load: Callable[[str], pd.DataFrame],
+        derived: dict[str, Callable[[pd.DataFrame], Any]],
+        boundary: Callable[[], dict | None],
+    ):
+        self.path = path
+        self._version_of = version
+        self._load = load
+        self._derived = derived
+        self._boundary = boundary
+        self.version = version(path)
+        self.pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="gwi-warmup")
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reload_queued = False
+        self.futures: dict[str, Future] = {
+            **self._load_data_stages(),
+            "boundary": self.pool.submit(boundary),
+        }
+        threading.Thread(
+            target=self._refresh_loop, name="gwi-refresh", daemon=True
+        ).start()
+
+    def _then(self, source: Future, fn) -> Future:
+        """Future for ``fn(source.result())``, queued only once ``source`` is done so
+        no worker ever sits blocked waiting on another task.
+        """
+        target = Future()
+
+        def run(src: Future) -> None:
+            try:
+                target.set_result(fn(src.result()))
+            except Exception as exc:
+                target.set_exception(exc)
+
+        def queue(src: Future) -> None:
+            try:
+                self.pool.submit(run, src)
+            except RuntimeError:  # pool already shut down — finish inline
+                run(src)
+
+        source.add_done_callback(queue)
+        return target
+
+    def _load_data_stages(self) -> dict[str, Future]:
+        data = self.pool.submit(self._load, self.path)
+        return {
+            "data": data,
+            **{name: self._then(data, fn) for name, fn in self._derived.items()},
+        }
+
+    def _failed(self, stage: str) -> bool:
+        fut = self.futures[stage]
+        return fut.done() and fut.exception() is not None
+
+    def close(self) -> None:
+        """Stop refreshing and release the pool; queued work still completes."""
+        self._stop.set()
+        self.pool.shutdown(wait=False)
+
+    def ready(self) -> dict[str, bool]:
+        return {stage: fut.done() for stage, fut in self.futures.items()}
+
+    def refresh_stale(self) -> None:
+        """Run on every script run. Restarts the data stages if the load raised (e.g.
+        the CSV was read mid-write), and queues a reload as soon as the CSV is replaced;
+        the check is a single stat call.
+        """
+        with self._lock:
+            # Only the CSV read can fail transiently; the builders are deterministic
+            # for a given frame, so rerunning them after their own failure won't help
+            if self._failed("data"):
+                self.version = self._version_of(self.path)
+                self.futures = {**self.futures, **self._load_data_stages()}
+                return
+            if self._reload_queued or self._version_of(self.path) == self.version:
+                return
+            self._reload_queued = True
+        self.pool.submit(self._refresh_data)
+
+    def _refresh_data(self) -> None:
+        try:
+            version = self._version_of(self.path)
+            if version == self.version and not self._failed("data"):
+                return
+            df = self._load(self.path)
+            fresh = {
+                "data": _resolved(df),
+                **{name: _resolved(fn(df)) for name, fn in self._derived.items()},
+            }
+            # Swap the whole mapping at once so a reader's snapshot stays consistent
+            with self._lock:
+                self.futures = {**self.futures, **fresh}
+                self.version = version
+        finally:
+            self._reload_queued = False
+
+    def _refresh_boundary(self) -> None:
+        # Nominatim hiccups return None — keep serving the boundary we already have
+        boundary = self._boundary()
+        if boundary is not None:
+            with self._lock:
+                self.futures = {**self.futures, "boundary": _resolved(boundary)}
+
+    def _refresh_loop(self) -> None:
+        jobs = [(DATA_TTL, self._refresh_data), (BOUNDARY_TTL, self._refresh_boundary)]
+        next_due = [time.monotonic() + ttl * REFRESH_AHEAD for ttl, _ in jobs]
+        while not self._stop.wait(max(0.0, min(next_due) - time.monotonic())):
+            for i, (ttl, job) in enumerate(jobs):
+                if time.monotonic() >= next_due[i]:
+                    self.pool.submit(job)
+                    next_due[i] = time.monotonic() + ttl * REFRESH_AHEAD
+
+
+_live: Warmup | None = None
+
+
+def start(path: str, **loaders) -> Warmup:
+    """Start a Warmup for ``path``, closing the one it replaces (e.g. after the
+    resource cache was cleared) so its pool and refresh thread don't linger.
+    """
+    global _live
+    if _live is not None:
+        _live.close()
+    _live = Warmup(path, **loaders)
+    return _live